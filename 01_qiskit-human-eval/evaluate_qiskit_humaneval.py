@@ -21,21 +21,32 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
+import functools
+import hashlib
 import json
+import multiprocessing
 import os
+import pickle
 import re
 import subprocess
 import sys
 import tempfile
 import textwrap
+import threading
 import time
-from dataclasses import dataclass, asdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict
 
-# Third-party
-from datasets import load_dataset  # pip install datasets
-from openai import OpenAI, APIError, APIStatusError, APIConnectionError  # pip install openai
+# Third-party deps (datasets, openai) are imported lazily inside the functions
+# that need them so --help / cache-only paths don't pay their import cost.
+
+try:
+    import orjson  # C serializer, ~5-10x faster than stdlib json
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 # ----------------------------
 # CLI & defaults
@@ -54,11 +65,18 @@ def build_cli() -> argparse.Namespace:
     p.add_argument("--max-items", type=int, default=None, help="Limit number of tasks for a quick run.")
     p.add_argument("--temperature", type=float, default=0.0, help="Sampling temperature.")
     p.add_argument("--top_p", type=float, default=1.0, help="Nucleus sampling top_p.")
-    p.add_argument("--max-output-tokens", type=int, default=800, help="Max tokens to generate.")
+    # Most QiskitHumanEval solutions are <200 tokens and per-token decode
+    # dominates request latency, so the cap stays aggressive by default.
+    p.add_argument("--max-output-tokens", type=int, default=300, help="Max tokens to generate.")
     p.add_argument("--seed", type=int, default=42, help="Sampling seed (for determinism where supported).")
-    p.add_argument("--parallel", type=int, default=1, help="(Sequential driver for reliability) Number of concurrent gens (>=1).")
+    p.add_argument("--parallel", type=int, default=1, help="Number of concurrent generation requests (>=1).")
     p.add_argument("--timeout-sec", type=int, default=45, help="Per-test execution timeout (seconds).")
+    p.add_argument("--isolated-exec", action="store_true",
+                   help="Spawn a fresh python -I subprocess per task instead of the persistent worker pool (slower, stronger isolation).")
     p.add_argument("--outdir", default="out", help="Directory to write logs/artifacts.")
+    p.add_argument("--run-dir", default=None,
+                   help="Reuse this exact output directory instead of a fresh timestamped one; "
+                        "a re-run resumes from its progress.jsonl, skipping completed tasks.")
     p.add_argument("--dry-run", action="store_true", help="Skip model calls and reuse previous generations if present.")
     return p.parse_args()
 
@@ -88,6 +106,42 @@ class Result:
     model: str
     file_path: str
 
+RESULT_FIELDS = [f.name for f in fields(Result)]
+
+# Below this many results, the plain-Python Counter sweep wins; above it the
+# numpy columnar path avoids re-scanning Python objects per bucket.
+SUMMARY_VECTORIZE_MIN = 500
+
+def difficulty_breakdown(results: List[Result]) -> Dict[str, Dict[str, int]]:
+    """
+    Per-difficulty {passed, total} tallies. Small runs (the 151-task default)
+    use one Counter sweep; larger supersets switch to numpy boolean masks over
+    columnar arrays.
+    """
+    if len(results) < SUMMARY_VECTORIZE_MIN:
+        passed_ctr: Counter = Counter()
+        total_ctr: Counter = Counter()
+        for r in results:
+            # str() matches the numpy path and keeps keys orjson-serializable
+            # (difficulty_scale is None when the dataset row lacks the field)
+            key = str(r.difficulty_scale)
+            total_ctr[key] += 1
+            passed_ctr[key] += r.passed
+        return {
+            k: {"passed": passed_ctr[k], "total": total_ctr[k]}
+            for k in sorted(total_ctr)
+        }
+
+    import numpy as np
+
+    scales = np.array([str(r.difficulty_scale) for r in results])
+    passed = np.array([r.passed for r in results], dtype=bool)
+    breakdown = {}
+    for k in np.unique(scales):  # np.unique returns sorted keys
+        mask = scales == k
+        breakdown[str(k)] = {"passed": int(passed[mask].sum()), "total": int(mask.sum())}
+    return breakdown
+
 # ----------------------------
 # Utility: file safe writing
 # ----------------------------
@@ -116,26 +170,59 @@ USER_SUFFIX = (
     "# IMPORTANT: Output ONLY the function definition (no imports, no tests, no comments above the def).\n"
 )
 
-CODE_BLOCK_RE = re.compile(r"```(?:python)?\s*(.*?)```", re.DOTALL)
+@functools.lru_cache(maxsize=256)
+def _with_suffix(prompt: str) -> str:
+    """Prompt + USER_SUFFIX, memoized: retries and repeat submissions of the
+    same task otherwise re-allocate the multi-KB concatenation each call."""
+    return prompt + USER_SUFFIX
+
+CODE_BLOCK_RE = re.compile(r"```(?:python)?\n?(.*?)```", re.DOTALL)
 
 def extract_code_only(text: str) -> str:
     """
     Try to robustly extract Python code from an LLM response:
     - Prefer fenced code blocks if present.
     - Otherwise, return the raw text (already instructed to be code-only).
+
+    The system prompt forbids fences, so most responses have none; the cheap
+    substring check skips the DOTALL regex scan on that common path.
     """
-    m = CODE_BLOCK_RE.search(text)
-    return m.group(1).strip() if m else text.strip()
+    t = text.strip()
+    if "```" not in t:
+        return t
+    m = CODE_BLOCK_RE.search(t)
+    return m.group(1).strip() if m else t
 
 # ----------------------------
 # OpenAI call
 # ----------------------------
-def call_openai(client: OpenAI, model: str, prompt: str, temperature: float, top_p: float, max_output_tokens: int, seed: int) -> Tuple[str, Optional[int]]:
+def _cache_key(model: str, prompt: str, temperature: float, top_p: float, max_output_tokens: int) -> str:
+    """Content-addressed key over everything that determines a (deterministic) response."""
+    payload = f"{model}|{temperature}|{top_p}|{max_output_tokens}|{prompt}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def call_openai(client: OpenAI, model: str, prompt: str, temperature: float, top_p: float, max_output_tokens: int, seed: int, cache_dir: Optional[Path] = None) -> Tuple[str, Optional[int]]:
     """
     Use the Responses API to generate code. Returns (text, output_token_count|None).
+
+    When temperature == 0.0 sampling is deterministic, so responses are cached
+    under cache_dir keyed by (model, sampling params, prompt); iterative runs
+    with unchanged prompts skip the API call (and its billing) entirely.
     """
+    cache_path: Optional[Path] = None
+    if cache_dir is not None and temperature == 0.0:
+        cache_path = cache_dir / f"{_cache_key(model, prompt, temperature, top_p, max_output_tokens)}.json"
+        if cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text(encoding="utf-8"))
+                return cached["text"], cached.get("output_tokens")
+            except Exception:
+                pass  # unreadable entry; regenerate below
+
+    from openai import APIError, APIStatusError, APIConnectionError
+
     # The dataset's 'prompt' contains imports + signature; we append user suffix to nudge correct format.
-    input_text = prompt + USER_SUFFIX
+    input_text = _with_suffix(prompt)
     t0 = time.time()
     try:
         resp = client.responses.create(
@@ -149,6 +236,8 @@ def call_openai(client: OpenAI, model: str, prompt: str, temperature: float, top
             top_p=top_p,
             max_output_tokens=max_output_tokens,
             # seed parameter removed as it's not supported by Responses API
+            # (likewise no stop sequences; max_output_tokens is the only
+            # output cap available here)
         )
         latency = time.time() - t0
     except (APIStatusError, APIConnectionError, APIError) as e:
@@ -164,25 +253,59 @@ def call_openai(client: OpenAI, model: str, prompt: str, temperature: float, top
     except Exception:
         pass
 
+    if cache_path is not None:
+        ensure_dir(cache_path.parent)
+        fd, tmp = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "output_tokens": out_tok}, f)
+        os.replace(tmp, cache_path)
+
     return text, out_tok
 
+# Concurrent generations share stdout; serialize prints so task logs don't interleave.
+_PRINT_LOCK = threading.Lock()
+
+def log(msg: str) -> None:
+    with _PRINT_LOCK:
+        print(msg)
+
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY_S = 2.0
+
+def call_openai_with_retry(client: OpenAI, model: str, prompt: str, temperature: float, top_p: float, max_output_tokens: int, seed: int, cache_dir: Optional[Path] = None) -> Tuple[str, Optional[int]]:
+    """
+    Retry wrapper around call_openai with exponential backoff.
+    Concurrent generations routinely provoke 429s/transient errors; retrying
+    keeps a single rate-limit hiccup from failing a whole task.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return call_openai(client, model, prompt, temperature, top_p, max_output_tokens, seed, cache_dir=cache_dir)
+        except RuntimeError as e:
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            delay = RETRY_BASE_DELAY_S * (2 ** attempt)
+            log(f"  OpenAI error (attempt {attempt+1}/{RETRY_ATTEMPTS}), retrying in {delay:.0f}s: {e}")
+            time.sleep(delay)
+    raise RuntimeError("unreachable")  # pragma: no cover
+
 # ----------------------------
 # Execution harness
 # ----------------------------
-EXEC_TEMPLATE = """\
-# === BEGIN PROMPT (dataset) ===
-{prompt}
-
-# === BEGIN MODEL COMPLETION ===
-{completion}
+# The combined program is assembled with str.join over literal segments; the
+# old EXEC_TEMPLATE.format(...) re-parsed the template's replacement fields and
+# re-copied all four large blobs on every task.
+_EXEC_PREFIX = "# === BEGIN PROMPT (dataset) ===\n"
+_EXEC_MID1 = "\n\n# === BEGIN MODEL COMPLETION ===\n"
+_EXEC_MID2 = "\n\n# === BEGIN TEST CODE (dataset) ===\n"
+_EXEC_MID3 = """\
 
-# === BEGIN TEST CODE (dataset) ===
-{test_code}
 
 # === HARNESS ===
 def __run_check():
     # Import the solution function by name and run dataset's check()
-    return check({entry_point})
+    return check("""
+_EXEC_SUFFIX = """)
 
 if __name__ == "__main__":
     try:
@@ -192,109 +315,262 @@ if __name__ == "__main__":
         print("___QHE_FAIL___:" + repr(e))
 """
 
-def run_in_subprocess(code: str, timeout_sec: int) -> Tuple[bool, Optional[str]]:
+def build_program(prompt: str, completion: str, test_code: str, entry_point: str) -> str:
+    return "".join([
+        _EXEC_PREFIX, prompt,
+        _EXEC_MID1, completion,
+        _EXEC_MID2, test_code,
+        _EXEC_MID3, entry_point,
+        _EXEC_SUFFIX,
+    ])
+
+def parse_harness_output(out: str) -> Tuple[bool, Optional[str]]:
+    """Map harness stdout to (passed, error_str_if_any)."""
+    if "___QHE_PASS___" in out:
+        return True, None
+    # Try to capture explicit failure reason
+    m = re.search(r"___QHE_FAIL___:(.*)$", out, flags=re.M | re.S)
+    return False, (m.group(1).strip() if m else f"RuntimeError: {out[:5000]}")
+
+def _worker_preimport() -> None:
+    """Pool initializer: pay the interpreter + qiskit import cost once per worker."""
+    try:
+        import numpy  # noqa: F401
+        import qiskit  # noqa: F401
+    except ImportError:
+        pass
+
+def _worker_exec_task(code: str) -> Tuple[bool, Optional[str]]:
+    """Run one combined program inside a pool worker, capturing its stdout."""
+    import contextlib
+    import io
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+            exec(compile(code, "<task>", "exec"), {"__name__": "__main__"})
+    except SystemExit:
+        pass
+    except Exception as e:
+        return False, f"WorkerError: {e!r}"
+    return parse_harness_output(buf.getvalue().strip())
+
+class WorkerPool:
     """
-    Execute the provided code string in a fresh Python subprocess with a timeout.
-    Returns (passed, error_str_if_any).
+    Persistent pool of worker processes for task execution.
 
-    We deliberately avoid importing this code in the current process.
+    Each worker imports qiskit once (via the initializer), so per-task cost is
+    just the user code instead of interpreter startup + imports. A task that
+    times out leaves its worker wedged mid-execution, so the whole pool is
+    terminated and respawned for the next task.
     """
-    with tempfile.TemporaryDirectory() as td:
-        src = Path(td) / "eval_task.py"
-        src.write_text(code, encoding="utf-8")
 
+    def __init__(self, processes: int):
+        self.processes = processes
+        self._pool = self._spawn()
+
+    def _spawn(self) -> multiprocessing.pool.Pool:
+        return multiprocessing.Pool(processes=self.processes, initializer=_worker_preimport)
+
+    def run(self, code: str, timeout_sec: int) -> Tuple[bool, Optional[str]]:
+        async_res = self._pool.apply_async(_worker_exec_task, (code,))
         try:
-            # -I: isolate (no user site); -B: no .pyc; -S: don't import site (reduce side effects)
-            p = subprocess.run(
-                [sys.executable, "-I", "-B", str(src)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                timeout=timeout_sec,
-                text=True,
-                env=os.environ.copy(),
-            )
-        except subprocess.TimeoutExpired:
+            return async_res.get(timeout=timeout_sec)
+        except multiprocessing.TimeoutError:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = self._spawn()
             return False, f"Timeout({timeout_sec}s)"
         except Exception as e:
-            return False, f"SubprocessError: {e!r}"
+            return False, f"WorkerError: {e!r}"
+
+    def close(self) -> None:
+        self._pool.terminate()
+        self._pool.join()
+
+def run_in_subprocess(code: str, timeout_sec: int) -> Tuple[bool, Optional[str]]:
+    """
+    Execute the provided code string in a fresh Python subprocess with a timeout.
+    Returns (passed, error_str_if_any).
+
+    The program is fed via stdin (python -) rather than a temp file, skipping a
+    directory create/remove plus file write per task and keeping throwaway temp
+    paths out of tracebacks.
+
+    We deliberately avoid importing this code in the current process.
+    """
+    try:
+        # -I: isolate (no user site); -B: no .pyc; "-": read the program from stdin
+        p = subprocess.run(
+            [sys.executable, "-I", "-B", "-"],
+            input=code,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=timeout_sec,
+            text=True,
+            env=None,  # inherit the parent environment at the OS level, no dict copy
+        )
+    except subprocess.TimeoutExpired:
+        return False, f"Timeout({timeout_sec}s)"
+    except Exception as e:
+        return False, f"SubprocessError: {e!r}"
 
-        out = (p.stdout or "").strip()
-        if "___QHE_PASS___" in out:
-            return True, None
-        # Try to capture explicit failure reason
-        m = re.search(r"___QHE_FAIL___:(.*)$", out, flags=re.M | re.S)
-        return False, (m.group(1).strip() if m else f"RuntimeError: {out[:5000]}")
+    return parse_harness_output((p.stdout or "").strip())
 
 # ----------------------------
 # Main evaluation loop
 # ----------------------------
-def load_tasks(dataset: str, split: str, limit: Optional[int]) -> List[Task]:
-    ds = load_dataset(dataset, split=split)  # requires internet on first run
-    tasks: List[Task] = []
-    for i, row in enumerate(ds):
-        if limit is not None and i >= limit:
-            break
-        tasks.append(Task(
-            idx=i,
-            task_id=row.get("task_id", f"{i}"),
-            entry_point=row["entry_point"],
-            prompt=row["prompt"],
-            test=row["test"],
-            difficulty_scale=row.get("difficulty_scale"),
-        ))
+# Re-download/re-parse the dataset at most this often; tasks are effectively static.
+TASK_CACHE_TTL_S = 7 * 24 * 3600
+
+def load_tasks(dataset: str, split: str, limit: Optional[int], outdir: str) -> List[Task]:
+    cache = Path(outdir) / ".cache" / f"{dataset.replace('/', '_')}_{split}.pkl"
+
+    tasks: Optional[List[Task]] = None
+    if cache.exists() and (time.time() - cache.stat().st_mtime) < TASK_CACHE_TTL_S:
+        try:
+            tasks = pickle.loads(cache.read_bytes())
+        except Exception:
+            tasks = None  # corrupt or stale cache; fall back to a fresh load
+
+    if tasks is None:
+        from datasets import load_dataset  # pip install datasets
+
+        ds = load_dataset(dataset, split=split)  # requires internet on first run
+        tasks = [
+            Task(
+                idx=i,
+                task_id=row.get("task_id", f"{i}"),
+                entry_point=row["entry_point"],
+                prompt=row["prompt"],
+                test=row["test"],
+                difficulty_scale=row.get("difficulty_scale"),
+            )
+            for i, row in enumerate(ds)
+        ]
+        ensure_dir(cache.parent)
+        # Atomic write (tempfile + rename) so a crash can't leave a truncated cache.
+        fd, tmp = tempfile.mkstemp(dir=cache.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(tasks, f)
+        os.replace(tmp, cache)
+
+    if limit is not None:
+        tasks = tasks[:limit]
     return tasks
 
 def evaluate(args: argparse.Namespace) -> None:
     run_ts = now_stamp()
-    out_root = Path(args.outdir) / f"{Path(args.dataset).name}_{run_ts}_{args.model.replace('/', '_')}"
+    if args.run_dir:
+        out_root = Path(args.run_dir)
+    else:
+        out_root = Path(args.outdir) / f"{Path(args.dataset).name}_{run_ts}_{args.model.replace('/', '_')}"
     gens_dir = out_root / "generations"
     ensure_dir(gens_dir)
 
-    client = OpenAI()  # reads OPENAI_API_KEY from env
+    import httpx
+    from openai import OpenAI  # pip install openai
 
-    tasks = load_tasks(args.dataset, args.split, args.max_items)
+    # One shared transport for all generation threads: a pool sized to the
+    # parallelism so concurrent requests don't serialize on connection setup,
+    # and HTTP/2 (when the h2 extra is installed) to multiplex them over a
+    # single TLS session.
+    pool_size = max(16, args.parallel * 2)
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    try:
+        http_client = httpx.Client(http2=True, timeout=60.0, limits=limits)
+    except ImportError:  # h2 not installed; fall back to HTTP/1.1 keep-alive
+        http_client = httpx.Client(timeout=60.0, limits=limits)
+    client = OpenAI(http_client=http_client)  # reads OPENAI_API_KEY from env
+    llm_cache_dir = Path(args.outdir) / ".llm_cache"  # shared across runs, hit only at temperature 0
+
+    tasks = load_tasks(args.dataset, args.split, args.max_items, args.outdir)
     print(f"Loaded {len(tasks)} tasks from {args.dataset}:{args.split}")
 
     results: List[Result] = []
 
+    # Resume bookkeeping: progress.jsonl holds one full result record per
+    # completed task. On a --run-dir re-run those records seed `results` (so
+    # the summary counts them) and their tasks skip generation and execution.
+    progress_path = out_root / "progress.jsonl"
+    completed: set = set()
+    if progress_path.exists():
+        for line in progress_path.read_text(encoding="utf-8").splitlines():
+            try:
+                rec = json.loads(line)
+                res = Result(**{k: rec[k] for k in RESULT_FIELDS})
+            except (ValueError, KeyError, TypeError):
+                continue  # torn line from a crash; the task just re-runs
+            results.append(res)
+            completed.add(res.task_id)
+    pending = [t for t in tasks if t.task_id not in completed]
+
+    # ---- Phase 1: generations (network-bound; run them concurrently) ----
+    def generate_for_task(t: Task) -> Tuple[str, Optional[int]]:
+        gen_path = gens_dir / f"{t.idx:03d}_{t.entry_point}.py"
+        if args.dry_run and gen_path.exists():
+            log(f"  [{t.idx+1}/{len(tasks)}] {t.task_id}: (dry-run) loaded cached completion.")
+            return gen_path.read_text(encoding="utf-8"), None
+
+        try:
+            raw_text, output_tokens = call_openai_with_retry(
+                client=client,
+                model=args.model,
+                prompt=t.prompt,
+                temperature=args.temperature,
+                top_p=args.top_p,
+                max_output_tokens=args.max_output_tokens,
+                seed=args.seed,
+                cache_dir=llm_cache_dir,
+            )
+        except RuntimeError as e:
+            log(f"  [{t.idx+1}/{len(tasks)}] {t.task_id}: OpenAI error: {e}")
+            raw_text, output_tokens = "", None
+
+        completion_text = extract_code_only(raw_text)
+        # Write immediately so an interrupted run keeps its finished generations.
+        gen_path.write_text(completion_text, encoding="utf-8")
+        log(f"  [{t.idx+1}/{len(tasks)}] {t.task_id}: generation done.")
+        return completion_text, output_tokens
+
+    completions: Dict[int, Tuple[str, Optional[int]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as ex:
+        futures = {ex.submit(generate_for_task, t): t for t in pending}
+        for fut in as_completed(futures):
+            completions[futures[fut].idx] = fut.result()
+
+    # ---- Phase 2: execution (persistent worker pool amortizes qiskit import) ----
+    # Stream results to disk as they arrive: a crash mid-run keeps everything
+    # finished so far. On resume the CSV is appended to, never rewritten, so
+    # rows from the previous run survive.
+    csv_path = out_root / "results.csv"
+    resuming = csv_path.exists() and csv_path.stat().st_size > 0
+    csv_f = csv_path.open("a" if resuming else "w", newline="", encoding="utf-8")
+    w = csv.DictWriter(csv_f, fieldnames=RESULT_FIELDS)
+    if not resuming:
+        w.writeheader()
+
+    progress_f = progress_path.open("a", encoding="utf-8")
+
+    # Execution is serial (run() blocks on each task), so one persistent
+    # worker suffices; --parallel only governs generation concurrency.
+    pool = None if args.isolated_exec else WorkerPool(processes=1)
     for t in tasks:
+        if t.task_id in completed:
+            print(f"=== [{t.idx+1}/{len(tasks)}] {t.task_id} :: already completed, skipping ===")
+            continue
         print(f"\n=== [{t.idx+1}/{len(tasks)}] {t.task_id} :: {t.entry_point} ===")
         gen_path = gens_dir / f"{t.idx:03d}_{t.entry_point}.py"
-
-        # 1) Get / reuse generation
-        if args.dry_run and gen_path.exists():
-            completion_text = gen_path.read_text(encoding="utf-8")
-            output_tokens = None
-            print("  (dry-run) Loaded cached completion.")
-        else:
-            try:
-                raw_text, output_tokens = call_openai(
-                    client=client,
-                    model=args.model,
-                    prompt=t.prompt,
-                    temperature=args.temperature,
-                    top_p=args.top_p,
-                    max_output_tokens=args.max_output_tokens,
-                    seed=args.seed,
-                )
-            except RuntimeError as e:
-                print(f"  OpenAI error: {e}")
-                raw_text, output_tokens = "", None
-
-            completion_text = extract_code_only(raw_text)
-            gen_path.write_text(completion_text, encoding="utf-8")
+        completion_text, output_tokens = completions[t.idx]
 
         # 2) Build executable combined program
-        program = EXEC_TEMPLATE.format(
-            prompt=t.prompt,
-            completion=completion_text,
-            test_code=t.test,
-            entry_point=t.entry_point,
-        )
+        program = build_program(t.prompt, completion_text, t.test, t.entry_point)
 
         # 3) Execute tests
         t0 = time.time()
-        passed, err = run_in_subprocess(program, timeout_sec=args.timeout_sec)
+        if pool is not None:
+            passed, err = pool.run(program, timeout_sec=args.timeout_sec)
+        else:
+            passed, err = run_in_subprocess(program, timeout_sec=args.timeout_sec)
         latency = time.time() - t0
 
         # 4) Record result
@@ -312,21 +588,23 @@ def evaluate(args: argparse.Namespace) -> None:
             file_path=str(gen_path),
         )
         results.append(res)
+        w.writerow(asdict(res))
+        csv_f.flush()
+        os.fsync(csv_f.fileno())
+        progress_f.write(json.dumps(asdict(res)) + "\n")
+        progress_f.flush()
         print(f"  -> {'PASS' if passed else 'FAIL'}{'' if passed else f' | {err}'}")
 
+    csv_f.close()
+    progress_f.close()
+    if pool is not None:
+        pool.close()
+
     # ---------------- Summary & persistence ----------------
     passed_n = sum(1 for r in results if r.passed)
     total_n = len(results)
     pass_at_1 = passed_n / total_n if total_n else 0.0
 
-    # Save CSV
-    csv_path = out_root / "results.csv"
-    with csv_path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=list(asdict(results[0]).keys()))
-        w.writeheader()
-        for r in results:
-            w.writerow(asdict(r))
-
     # Save summary JSON
     summary = {
         "model": args.model,
@@ -336,18 +614,16 @@ def evaluate(args: argparse.Namespace) -> None:
         "pass_at_1": pass_at_1,
         "passed": passed_n,
         "total": total_n,
-        "by_difficulty": {
-            k: {
-                "passed": sum(1 for r in results if r.passed and r.difficulty_scale == k),
-                "total": sum(1 for r in results if r.difficulty_scale == k),
-            }
-            for k in sorted({r.difficulty_scale for r in results})
-        },
+        "by_difficulty": difficulty_breakdown(results),
     }
-    (out_root / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    if orjson is not None:
+        summary_bytes = orjson.dumps(summary, option=orjson.OPT_INDENT_2)
+    else:
+        summary_bytes = json.dumps(summary, indent=2).encode("utf-8")
+    (out_root / "summary.json").write_bytes(summary_bytes)
 
     print("\n=== SUMMARY ===")
-    print(json.dumps(summary, indent=2))
+    print(summary_bytes.decode("utf-8"))
     print(f"\nArtifacts written to: {out_root}")
 
 if __name__ == "__main__":
@@ -4,10 +4,24 @@ API Key Management Component
 import streamlit as st
 import os
 import time
-from utils.encryption import save_encrypted_key, load_encrypted_key, create_fernet
+from utils.encryption import save_encrypted_key, load_encrypted_key, create_fernet, decrypt_key
 from config.constants import GPT_MODELS, GEMINI_MODELS
 
 
+@st.cache_data(ttl=5)
+def _key_file_exists(path: str) -> bool:
+    """Existence check cached briefly so every sidebar rerun skips the stat."""
+    return os.path.exists(path)
+
+
+def _load_key_pair(username_display: str) -> tuple:
+    """Read both encrypted key blobs in one place (either may be None)."""
+    return (
+        load_encrypted_key(username_display),
+        load_encrypted_key(username_display + '_gai'),
+    )
+
+
 def render_api_management():
     st.markdown('<div class="sidebar-title">🔐 API & Assistants</div>', unsafe_allow_html=True)
     
@@ -25,8 +39,8 @@ def render_api_management():
     username_display = username if username else 'anon'
     openai_file = f"{username_display}_encrypted_api_key"
     gemini_file = f"{username_display}_gai_encrypted_api_key"
-    openai_file_exists = os.path.exists(openai_file)
-    gemini_file_exists = os.path.exists(gemini_file)
+    openai_file_exists = _key_file_exists(openai_file)
+    gemini_file_exists = _key_file_exists(gemini_file)
     
     openai_loaded = bool(st.session_state.get("saved_api_key"))
     gemini_loaded = bool(st.session_state.get("saved_api_key_gai"))
@@ -53,7 +67,7 @@ def _render_save_button(username_display, user_password, openai_loaded, gemini_l
     if (openai_loaded or gemini_loaded) and user_password and username_display and \
        (not openai_file_exists or not gemini_file_exists):
         if st.button("💾 Save API Key(s) as encrypted file"):
-            fernet = create_fernet(user_password)
+            fernet = create_fernet(user_password, username_display)
             try:
                 if openai_loaded and not openai_file_exists:
                     encrypted_key = fernet.encrypt(st.session_state.saved_api_key.encode())
@@ -70,6 +84,7 @@ def _render_save_button(username_display, user_password, openai_loaded, gemini_l
                         st.warning("Gemini API key encrypted but couldn't save to file! ⚠️")
             except Exception as e:
                 st.error(f"Error saving API key: {str(e)}")
+            _key_file_exists.clear()  # files just appeared; drop the cached stat
             st.rerun()
 
 
@@ -79,21 +94,18 @@ def _render_load_button(username, user_password, username_display,
         if not username or not user_password:
             st.error("Please enter both username and password to load saved API key(s).")
         else:
-            fernet = create_fernet(user_password)
             error = False
+            encrypted_key, encrypted_key_gai = _load_key_pair(username_display)
             try:
                 if openai_file_exists:
-                    encrypted_key = load_encrypted_key(username_display)
                     if encrypted_key:
-                        decrypted_key = fernet.decrypt(encrypted_key.encode()).decode()
-                        st.session_state.saved_api_key = decrypted_key
+                        # decrypt_key falls back to the pre-PBKDF2 scheme for old files
+                        st.session_state.saved_api_key = decrypt_key(encrypted_key, user_password, username_display)
                         st.success("OpenAI API key loaded from encrypted file! 🔑")
-                
+
                 if gemini_file_exists:
-                    encrypted_key_gai = load_encrypted_key(username_display+'_gai')
                     if encrypted_key_gai:
-                        decrypted_key_gai = fernet.decrypt(encrypted_key_gai.encode()).decode()
-                        st.session_state.saved_api_key_gai = decrypted_key_gai
+                        st.session_state.saved_api_key_gai = decrypt_key(encrypted_key_gai, user_password, username_display)
                         st.success("Gemini API key loaded from encrypted file! 🔑")
             except Exception:
                 st.error("Failed to decrypt API key(s): Please check your username and password.")
@@ -121,6 +133,7 @@ def _render_clear_button(openai_file_exists, gemini_file_exists, openai_file, ge
                     deleted_files = True
             except Exception as e:
                 error_message += f"Error clearing file: {str(e)}\n"
+            _key_file_exists.clear()  # files just vanished; drop the cached stat
             
             # Clear session state
             for k in ["saved_api_key", "saved_api_key_gai", "encrypted_key", "encrypted_key_gai"]:
@@ -1,8 +1,10 @@
 """
 Chat Interface Component
 """
+import io
+
 import streamlit as st
-from utils.helpers import Response, StreamHandler
+from utils.helpers import Response, StreamHandler, history_messages
 from tools.retrieval_tool import RetrievalTool
 from workflows.fast import fast_mode_stream
 from config.constants import RESPONSE_MODES
@@ -47,24 +49,19 @@ def _display_chat_history():
 
 
 def _process_user_input(user_input: str):
-    # display and save user input
+    # display and save user input (messages is the single source of truth)
     st.session_state.messages.append({"role": "user", "content": user_input})
-    st.session_state.memory.add_user_message(user_input)
     with st.chat_message("user"):
         st.markdown(user_input)
     
     # retrieve context
     retrieval_tool = RetrievalTool(vector_store=st.session_state.vector_store)
     context = retrieval_tool.retrieve(user_input)
-    
-    # count tokens
-    _count_tokens(user_input)
-    
+
     # generate assistant response
     with st.chat_message("assistant"):
         response = _generate_response(user_input, context)
-        
-        st.session_state.memory.add_ai_message(response.content)
+
         st.session_state.messages.append({"role": "assistant", "content": response.content})
         
         # rerun if code block is present in response
@@ -72,15 +69,6 @@ def _process_user_input(user_input: str):
             st.rerun()
 
 
-def _count_tokens(text: str):
-    try:
-        import tiktoken
-        enc = tiktoken.encoding_for_model("gpt-4")
-        st.session_state.last_token_count = len(enc.encode(text))
-    except:
-        st.session_state.last_token_count = 0
-
-
 def _generate_response(user_input: str, context: str) -> Response:
     mode = st.session_state.get("mode_is_fast", RESPONSE_MODES["FAST"])
     
@@ -97,19 +85,29 @@ def _generate_fast_mode_response(user_input: str, context: str) -> Response:
     stream_box = st.empty()
     stream_handler = StreamHandler(stream_box)
     
-    content = []
+    # StringIO grows its buffer geometrically; cheaper than a list of chunk
+    # strings plus a final join on long (1000+ chunk) responses
+    buf = io.StringIO()
     llm_stream = fast_mode_stream(
-        user_input, 
-        context, 
-        st.session_state.memory.messages, 
+        user_input,
+        context,
+        history_messages(st.session_state.messages),
         stream_handler
     )
-    
+
+    # token counts come from the API's own usage report (exact, matches
+    # billing) instead of re-tokenizing locally with tiktoken; the stream's
+    # final chunk carries usage_metadata when stream_usage is enabled
+    usage = None
     for chunk in llm_stream:
-        content.append(chunk.content)
-    
-    full_content = "".join(content)
-    response = Response(content=full_content)
+        buf.write(chunk.content)
+        chunk_usage = getattr(chunk, "usage_metadata", None)
+        if chunk_usage:
+            usage = chunk_usage
+
+    st.session_state.last_token_count = usage.get("input_tokens", 0) if usage else 0
+
+    response = Response(content=buf.getvalue())
     st.markdown(response.content)
     
     return response
@@ -3,8 +3,7 @@ RAG/Embedding Management Component
 """
 import streamlit as st
 import os
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+import pickle
 from config.constants import INDEX_PATH, INDEX_NAME
 
 
@@ -35,13 +34,44 @@ def render_rag_section():
         st.markdown(f"🧮 **Last response token usage:** `{st.session_state.last_token_count}` tokens")
 
 
-def _load_embeddings():
-    with st.spinner("Loading embeddings..."):
-        embeddings = OpenAIEmbeddings()
-        st.session_state.vector_store = FAISS.load_local(
-            folder_path=INDEX_PATH,
-            index_name=INDEX_NAME,
-            embeddings=embeddings,
+@st.cache_resource
+def _get_vector_store(index_path: str, index_name: str):
+    """Load the FAISS index once per process; every rerun/session reuses it.
+
+    The .faiss file is opened memory-mapped, so startup only pages in index
+    metadata — vectors are faulted in by the OS page cache as queries touch
+    them (and shared across Streamlit workers on the same host). Falls back
+    to the eager FAISS.load_local if the mmap path fails.
+    """
+    # imported lazily: langchain_openai/langchain_community are heavy and only
+    # needed once an index actually gets loaded
+    import faiss
+    from langchain_openai import OpenAIEmbeddings
+    from langchain_community.vectorstores import FAISS
+
+    try:
+        index = faiss.read_index(
+            os.path.join(index_path, index_name + ".faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+        )
+        with open(os.path.join(index_path, index_name + ".pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(
+            embedding_function=OpenAIEmbeddings(),
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
+    except Exception:
+        return FAISS.load_local(
+            folder_path=index_path,
+            index_name=index_name,
+            embeddings=OpenAIEmbeddings(),
             allow_dangerous_deserialization=True
         )
+
+
+def _load_embeddings():
+    with st.spinner("Loading embeddings..."):
+        st.session_state.vector_store = _get_vector_store(INDEX_PATH, INDEX_NAME)
         st.rerun()
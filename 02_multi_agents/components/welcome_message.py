@@ -2,12 +2,19 @@
 Welcome Message Component
 """
 import streamlit as st
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from utils.helpers import StreamHandler, read_prompt_from_file
+from utils.llm_clients import get_chat_client
 from config.constants import GEMINI_MODELS, PROMPT_PATHS
 
+# Built once at import: the prompt read is cached and LangChain messages are
+# immutable, so every greeting reuses the same objects instead of rebuilding
+# them per session start.
+_GREETING_MESSAGES = [
+    SystemMessage(content=read_prompt_from_file(PROMPT_PATHS["QISKIT_INSTRUCTIONS"])),
+    HumanMessage(content="Please greet the user and briefly explain what you can do as the CLASS code assistant.")
+]
+
 
 def render_welcome_message(api_key: str, api_key_gai: str):
     if not _should_show_welcome():
@@ -19,14 +26,13 @@ def render_welcome_message(api_key: str, api_key_gai: str):
         welcome_stream_handler = StreamHandler(welcome_container)
         
         # LLM initialization
-        streaming_llm = _initialize_llm(api_key, api_key_gai, welcome_stream_handler)
-        
+        streaming_llm = _initialize_llm(api_key, api_key_gai)
+
         # generate message
-        greeting = _generate_greeting(streaming_llm)
+        greeting = _generate_greeting(streaming_llm, welcome_stream_handler)
         
         # update session state
         st.session_state.messages.append({"role": "assistant", "content": greeting.content})
-        st.session_state.memory.add_ai_message(greeting.content)
         st.session_state.greeted = True
         
         if st.session_state.selected_model in GEMINI_MODELS:
@@ -34,36 +40,20 @@ def render_welcome_message(api_key: str, api_key_gai: str):
 
 
 def _should_show_welcome() -> bool:
+    # SessionStateManager.initialize() runs before render, so these keys
+    # always exist — direct attribute access skips .get's lock + default
     return (
-        st.session_state.get("llm_initialized", False) and
-        st.session_state.get("vector_store") is not None and
-        not st.session_state.get("greeted", False)
+        st.session_state.llm_initialized and
+        st.session_state.vector_store is not None and
+        not st.session_state.greeted
     )
 
 
-def _initialize_llm(api_key: str, api_key_gai: str, stream_handler):
-    if st.session_state.selected_model in GEMINI_MODELS:
-        return ChatGoogleGenerativeAI(
-            model=st.session_state.selected_model,
-            callbacks=[stream_handler],
-            temperature=1.0,
-            convert_system_message_to_human=True
-        )
-    else:
-        return ChatOpenAI(
-            model=st.session_state.selected_model,
-            streaming=True,
-            callbacks=[stream_handler],
-            temperature=1.0
-        )
+def _initialize_llm(api_key: str, api_key_gai: str):
+    # cached per (model, temperature); the stream handler is attached per call
+    return get_chat_client(st.session_state.selected_model, temperature=1.0)
 
 
-def _generate_greeting(streaming_llm):
-    initial_instructions = read_prompt_from_file(PROMPT_PATHS["QISKIT_INSTRUCTIONS"])
-    messages = [
-        SystemMessage(content=initial_instructions),
-        HumanMessage(content="Please greet the user and briefly explain what you can do as the CLASS code assistant.")
-    ]
-    
-    return streaming_llm.invoke(messages)
+def _generate_greeting(streaming_llm, stream_handler):
+    return streaming_llm.invoke(_GREETING_MESSAGES, config={"callbacks": [stream_handler]})
 
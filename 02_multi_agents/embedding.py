@@ -1,43 +1,238 @@
+import itertools
 import os
+import pickle
+import re
+import tempfile
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import faiss
+import numpy as np
 from dotenv import load_dotenv
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # fuzzy matching is optional; fall back to exact cache only
+    MinHash = MinHashLSH = None
+
 INDEX_FOLDER_NAME = "faiss_index"
 INDEX_FILE_NAME = "qiskit_docs_index"
+EMB_CACHE_DIR = ".emb_cache"
 
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 1000  # chunks embedded per batch while streaming the corpus
+
+# IVF+PQ instead of the IndexFlatL2 default: queries scan only the probed
+# cells' compressed codes rather than every fp32 vector in the corpus.
+INDEX_FACTORY = "IVF256,PQ32"
+NPROBE = 8  # cells probed per query; raise for recall, lower for latency
+
+# Below this many vectors IVF256 can't train well (faiss wants roughly 39
+# points per centroid), so fall back to an exact scan over fp16 codes:
+# same recall as Flat at half the bytes moved per query.
+MIN_IVF_TRAIN = 256 * 39
+SMALL_INDEX_FACTORY = "SQfp16"
+
+FUZZY_JACCARD = 0.95  # minimum estimated similarity to reuse a stored vector
+MINHASH_PERMS = 128
+# (minhash, vector) signatures persisted next to the exact cache so the *next*
+# indexing run can reuse vectors for chunks whose content hash changed
+FUZZY_SIG_FILE = os.path.join(EMB_CACHE_DIR, "fuzzy_signatures.pkl")
+
+_WS_RE = re.compile(r"\s+")
+
+def _canonicalize(text: str) -> str:
+    """Normalize away edits that shouldn't force a re-embed."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text).strip().lower())
+
+def _minhash(canon: str):
+    mh = MinHash(num_perm=MINHASH_PERMS)
+    words = canon.split()
+    for i in range(max(1, len(words) - 2)):  # 3-word shingles
+        mh.update(" ".join(words[i:i + 3]).encode("utf-8"))
+    return mh
+
+class FuzzyEmbeddings:
+    """
+    Near-duplicate-aware wrapper around an Embeddings implementation.
+
+    The exact content-hash cache misses on trivial edits (whitespace, typo
+    fixes). Each chunk is canonicalized and probed against a MinHash LSH index
+    of chunks already embedded; a hit at Jaccard >= FUZZY_JACCARD reuses the
+    stored vector, so only genuinely new text reaches the API. Signatures are
+    loaded from FUZZY_SIG_FILE so reuse works across indexing runs — exactly
+    the case where an edited chunk has already defeated the exact cache —
+    and misses register in the LSH before embedding, so near-duplicates
+    inside one batch also collapse to a single API text. Degrades to a pure
+    pass-through when datasketch isn't installed.
+    """
+
+    def __init__(self, inner, sig_path=FUZZY_SIG_FILE):
+        self.inner = inner
+        self._sig_path = sig_path
+        self._lsh = (
+            MinHashLSH(threshold=FUZZY_JACCARD, num_perm=MINHASH_PERMS)
+            if MinHashLSH is not None else None
+        )
+        self._vectors = {}
+        self._hashes = {}
+        self._count = 0
+        if self._lsh is not None and os.path.exists(sig_path):
+            try:
+                with open(sig_path, "rb") as f:
+                    self._count, self._hashes, self._vectors = pickle.load(f)
+                for key, mh in self._hashes.items():
+                    self._lsh.insert(key, mh)
+            except Exception:  # stale/corrupt signature file: start fresh
+                self._lsh = MinHashLSH(threshold=FUZZY_JACCARD, num_perm=MINHASH_PERMS)
+                self._vectors, self._hashes, self._count = {}, {}, 0
+
+    def embed_documents(self, texts):
+        if self._lsh is None:
+            return self.inner.embed_documents(texts)
+
+        vectors = [None] * len(texts)
+        miss_idx, miss_keys = [], []
+        deferred = {}  # key of an in-batch miss -> indexes awaiting its vector
+        for i, text in enumerate(texts):
+            mh = _minhash(_canonicalize(text))
+            matches = self._lsh.query(mh)
+            if matches:
+                key = matches[0]
+                if key in self._vectors:
+                    vectors[i] = self._vectors[key]
+                else:
+                    # near-duplicate of an earlier miss in this same batch;
+                    # fill in once its vector comes back
+                    deferred.setdefault(key, []).append(i)
+            else:
+                # insert before embedding so later texts in the batch hit it
+                key = f"chunk-{self._count}"
+                self._count += 1
+                self._lsh.insert(key, mh)
+                self._hashes[key] = mh
+                miss_idx.append(i)
+                miss_keys.append(key)
+
+        if miss_idx:
+            fresh = self.inner.embed_documents([texts[i] for i in miss_idx])
+            for i, key, vec in zip(miss_idx, miss_keys, fresh):
+                self._vectors[key] = vec
+                vectors[i] = vec
+            for key, idxs in deferred.items():
+                for i in idxs:
+                    vectors[i] = self._vectors[key]
+        return vectors
+
+    def embed_query(self, text):
+        return self.inner.embed_query(text)
+
+    def save(self):
+        """Persist the (minhash, vector) signatures for the next indexing run."""
+        if self._lsh is None:
+            return
+        os.makedirs(os.path.dirname(self._sig_path) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self._sig_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((self._count, self._hashes, self._vectors), f)
+        os.replace(tmp, self._sig_path)
 
 def get_all_docs_from_qiskit_data():
     """
     Get all qiskit documentation from Qiskit data.
+
+    The hundreds of small files are read through a thread pool so the reads
+    overlap instead of serializing on per-open latency.
     """
-    all_docs = []
-    for filename in os.listdir("./qiskit-data/1.4"):
-        file_path = os.path.join("./qiskit-data/1.4", filename)
-        if filename.endswith(('.txt', '.py', '.ini', 'mdx')):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-                all_docs.append(Document(
-                    page_content=text,
-                    metadata={"source": filename, "type": "code" if filename.endswith('.py') else "text"}
-                ))
-    return all_docs
+    root = "./qiskit-data/1.4"
+    filenames = [
+        f for f in os.listdir(root)
+        if f.endswith(('.txt', '.py', '.ini', '.mdx'))
+    ]
+
+    def _read(filename):
+        # errors='ignore' drops undecodable bytes at read time, so downstream
+        # chunking never needs to sanitize the text again
+        with open(os.path.join(root, filename), 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+
+    with ThreadPoolExecutor(max_workers=32) as ex:
+        texts = list(ex.map(_read, filenames))
+
+    return [
+        Document(
+            page_content=text,
+            metadata={"source": filename, "type": "code" if filename.endswith('.py') else "text"}
+        )
+        for filename, text in zip(filenames, texts)
+    ]
 
 def chunk_docs(documents):
     """
-    Split documents into chunks.
+    Split documents into chunks, yielded one source document at a time.
+
+    Generating keeps peak memory proportional to one document's splits rather
+    than the whole corpus, and fixes the old body's reference to the
+    module-global all_docs instead of the documents parameter.
     """
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
 
-    splits = text_splitter.split_documents(all_docs)
-    for doc in splits:
-        doc.page_content = doc.page_content.encode("utf-8", "ignore").decode("utf-8")
+    for doc in documents:
+        yield from text_splitter.split_documents([doc])
+
+def build_vectorstore(splits, embeddings):
+    """
+    Embed the chunks and index them with an IVF+PQ index.
+
+    FAISS.from_documents defaults to IndexFlatL2, an exhaustive O(N*d) scan
+    per query; the factory index trades a small recall drop for searching
+    only NPROBE of 256 coarse cells over 32-byte PQ codes. Corpora too small
+    to train IVF256 get an SQfp16 index instead — still exact, but scanning
+    half-width codes.
+
+    splits may be any iterable (e.g. the chunk_docs generator); chunks are
+    embedded in EMBED_BATCH_SIZE groups as they stream in, so splitting and
+    embedding pipeline without materializing the corpus twice.
+    """
+    splits_iter = iter(splits)
+    splits = []
+    vector_batches = []
+    while True:
+        batch = list(itertools.islice(splits_iter, EMBED_BATCH_SIZE))
+        if not batch:
+            break
+        splits.extend(batch)
+        vector_batches.append(np.asarray(
+            embeddings.embed_documents([doc.page_content for doc in batch]),
+            dtype="float32",
+        ))
+    vectors = np.concatenate(vector_batches)
+
+    if len(vectors) >= MIN_IVF_TRAIN:
+        index = faiss.index_factory(vectors.shape[1], INDEX_FACTORY)
+        index.train(vectors)
+        index.nprobe = NPROBE
+    else:
+        index = faiss.index_factory(vectors.shape[1], SMALL_INDEX_FACTORY)
+        index.train(vectors)
+    index.add(vectors)
 
-    return splits
+    ids = [str(uuid4()) for _ in splits]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, splits))),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
 
 
 # --- RAG/Embedding Section ---
@@ -46,9 +241,23 @@ if __name__ == "__main__":
     if not os.environ["OPENAI_API_KEY"]:
         print("OpenAI API key is required for embedding generation. Please enter your OpenAI API key in .env file.")
 
-    embeddings = OpenAIEmbeddings()
+    # chunk_size here is texts per embeddings HTTP request (unrelated to the
+    # splitter's CHUNK_SIZE): large batches mean far fewer API round-trips,
+    # and max_retries rides out the occasional 429 on those big requests.
+    base_embeddings = OpenAIEmbeddings(chunk_size=1000, max_retries=6)
+    # cache vectors on disk keyed by content hash: re-indexing only pays the
+    # API for new or changed chunks
+    embeddings = CacheBackedEmbeddings.from_bytes_store(
+        base_embeddings,
+        LocalFileStore(EMB_CACHE_DIR),
+        namespace=base_embeddings.model,
+    )
+    # fuzzy layer on top of the exact cache: near-duplicate chunks (trivial
+    # edits, boilerplate shared between docs) reuse an existing vector
+    embeddings = FuzzyEmbeddings(embeddings)
     all_docs = get_all_docs_from_qiskit_data()
     splits = chunk_docs(all_docs)
     
-    vectorstore = FAISS.from_documents(documents=splits, embedding=embeddings)
+    vectorstore = build_vectorstore(splits, embeddings)
     vectorstore.save_local(INDEX_FOLDER_NAME, INDEX_FILE_NAME)
+    embeddings.save()  # keep the fuzzy signatures for the next run
@@ -1,3 +1,4 @@
+import numpy as np
 from langchain_core.vectorstores import VectorStore
 
 class RetrievalTool:
@@ -5,5 +6,25 @@ class RetrievalTool:
         self.vs = vector_store
 
     def retrieve(self, query, top_k=5):
-        docs = self.vs.similarity_search(query, k=top_k)
-        return "\n\n".join([doc.page_content for doc in docs])
\ No newline at end of file
+        return self.retrieve_batch([query], top_k=top_k)[0]
+
+    def retrieve_batch(self, queries, top_k=5):
+        """
+        Batched retrieval: embed all queries at once and run a single FAISS
+        search, so the scan takes the matrix-matrix BLAS path instead of one
+        matrix-vector pass per query. Returns one joined context per query.
+        """
+        vectors = np.asarray(
+            self.vs.embedding_function.embed_documents(list(queries)),
+            dtype="float32",
+        )
+        _, indices = self.vs.index.search(vectors, top_k)
+
+        contexts = []
+        for row in indices:
+            docs = [
+                self.vs.docstore.search(self.vs.index_to_docstore_id[i])
+                for i in row if i != -1  # FAISS pads short result sets with -1
+            ]
+            contexts.append("\n\n".join(doc.page_content for doc in docs))
+        return contexts
@@ -2,7 +2,14 @@
 API Key Encryption Utilities
 """
 import base64
-from cryptography.fernet import Fernet
+import functools
+import os
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+KDF_ITERATIONS = 200_000
+_SALT_BYTES = 16
 
 
 def save_encrypted_key(encrypted_key: str, username: str) -> bool:
@@ -19,8 +26,15 @@ def save_encrypted_key(encrypted_key: str, username: str) -> bool:
         username = 'anon'
     try:
         filename = f"{username}_encrypted_api_key"
-        with open(filename, "w") as f:
-            f.write(encrypted_key)
+        # write-then-rename so a mid-write crash never leaves a torn key file
+        tmp = filename + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, encrypted_key.encode())
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, filename)
         return True
     except Exception:
         return False
@@ -39,22 +53,89 @@ def load_encrypted_key(username: str) -> str | None:
         username = 'anon'
     try:
         filename = f"{username}_encrypted_api_key"
-        with open(filename, "r") as f:
-            return f.read()
+        with open(filename, "rb") as f:
+            return f.read().decode()
     except FileNotFoundError:
         return None
 
 
-def create_fernet(password: str) -> Fernet:
+def _load_or_create_salt(username: str) -> bytes:
+    """Load the per-user KDF salt, creating it on first use
+
+    Args:
+        username: Username (used as filename prefix)
+
+    Returns:
+        Salt bytes
+    """
+    filename = f"{username}_salt"
+    try:
+        with open(filename, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        salt = os.urandom(_SALT_BYTES)
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, salt)
+        finally:
+            os.close(fd)
+        return salt
+
+
+@functools.lru_cache(maxsize=16)
+def create_fernet(password: str, username: str = 'anon') -> Fernet:
     """Create Fernet instance from password
-    
+
+    The key is derived with PBKDF2-HMAC-SHA256 over a per-user salt instead of
+    the old padded-password scheme, and the resulting Fernet is memoized per
+    (password, username) so repeated save/load calls skip the key stretch.
+
     Args:
         password: Password used for encryption/decryption
-        
+        username: Username whose salt file scopes the derivation
+
+    Returns:
+        Fernet instance
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=_load_or_create_salt(username),
+        iterations=KDF_ITERATIONS,
+    )
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(password.encode())))
+
+
+@functools.lru_cache(maxsize=16)
+def create_legacy_fernet(password: str) -> Fernet:
+    """Create Fernet using the pre-KDF padded-password key
+
+    Only for reading key files saved before the PBKDF2 change.
+
+    Args:
+        password: Password used for encryption/decryption
+
     Returns:
         Fernet instance
     """
     key = base64.urlsafe_b64encode(password.ljust(32)[:32].encode())
     return Fernet(key)
 
+
+def decrypt_key(encrypted_key: str, password: str, username: str = 'anon') -> str:
+    """Decrypt a stored key blob, falling back to the legacy scheme
+
+    Args:
+        encrypted_key: Encrypted API key
+        password: Password used for encryption/decryption
+        username: Username whose salt file scopes the derivation
+
+    Returns:
+        Decrypted API key
+    """
+    try:
+        return create_fernet(password, username).decrypt(encrypted_key.encode()).decode()
+    except InvalidToken:
+        return create_legacy_fernet(password).decrypt(encrypted_key.encode()).decode()
+
 # Made with Bob
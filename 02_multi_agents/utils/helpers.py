@@ -1,30 +1,63 @@
 """
 Helper Functions and Classes
 """
+import asyncio
+import functools
 import json
+import time
 import streamlit as st
-from langchain.callbacks.base import BaseCallbackHandler
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements
+    orjson = None
+from langchain.callbacks.base import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+def history_messages(messages) -> list:
+    """Convert chat history dicts into LangChain message objects
+
+    Args:
+        messages: Iterable of {"role", "content"} dicts (the session history)
+
+    Returns:
+        List of HumanMessage/AIMessage in conversation order
+    """
+    return [
+        HumanMessage(content=m["content"]) if m["role"] == "user"
+        else AIMessage(content=m["content"])
+        for m in messages
+    ]
 
 
 def read_keys_from_file(file_path: str) -> dict:
     """Read keys from JSON file
-    
+
+    Parses with orjson when available (runs at startup and on every key
+    refresh); falls back to stdlib json otherwise.
+
     Args:
         file_path: Path to JSON file
-        
+
     Returns:
         Loaded dictionary data
     """
-    with open(file_path, 'r') as file:
-        return json.load(file)
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
+@functools.lru_cache(maxsize=None)
 def read_prompt_from_file(path: str) -> str:
-    """Read prompt from file
-    
+    """Read prompt from file (cached per path)
+
+    Prompt files are static; caching avoids re-reading them from disk on
+    every Streamlit rerun.
+
     Args:
         path: Path to prompt file
-        
+
     Returns:
         Prompt text
     """
@@ -44,24 +77,98 @@ class Response:
 
 
 class StreamHandler(BaseCallbackHandler):
-    """Callback handler for streaming responses"""
-    
+    """Callback handler for streaming responses
+
+    Each container.markdown call pushes a full re-render over the Streamlit
+    websocket, so updates are coalesced: flushed every FLUSH_TOKENS tokens or
+    after FLUSH_INTERVAL_S seconds, with a final cursor-free flush at stream
+    end.
+    """
+
+    FLUSH_TOKENS = 8
+    FLUSH_INTERVAL_S = 0.03
+
     def __init__(self, container):
         """
         Args:
             container: Streamlit container (e.g., st.empty())
         """
         self.container = container
-        self.text = ""
+        self._parts = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        """Accumulated response text (kept for backward-compat readers)"""
+        return "".join(self._parts)
 
     def on_llm_new_token(self, token: str, **kwargs):
         """Process when new token is received
-        
+
         Args:
             token: Received token
             **kwargs: Other keyword arguments
         """
-        self.text += token
-        self.container.markdown(self.text + "▌")
+        self._parts.append(token)
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.FLUSH_TOKENS or now - self._last_flush > self.FLUSH_INTERVAL_S:
+            self.container.markdown("".join(self._parts) + "▌")
+            self._pending = 0
+            self._last_flush = now
+
+    def on_llm_end(self, response, **kwargs):
+        """Flush any buffered tokens without the cursor once the stream ends"""
+        self.container.markdown("".join(self._parts))
+        self._pending = 0
+
+
+class AsyncStreamHandler(AsyncCallbackHandler):
+    """Async callback handler for streaming responses
+
+    For ainvoke/astream chains: the sync StreamHandler would block the event
+    loop on every Streamlit write, stalling other coroutines. Flushes are
+    coalesced like the sync handler but dispatched via asyncio.to_thread so
+    the loop stays free.
+    """
+
+    FLUSH_TOKENS = StreamHandler.FLUSH_TOKENS
+    FLUSH_INTERVAL_S = StreamHandler.FLUSH_INTERVAL_S
+
+    def __init__(self, container):
+        """
+        Args:
+            container: Streamlit container (e.g., st.empty())
+        """
+        self.container = container
+        self._parts = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        """Accumulated response text (kept for backward-compat readers)"""
+        return "".join(self._parts)
+
+    async def on_llm_new_token(self, token: str, **kwargs):
+        """Process when new token is received
+
+        Args:
+            token: Received token
+            **kwargs: Other keyword arguments
+        """
+        self._parts.append(token)
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.FLUSH_TOKENS or now - self._last_flush > self.FLUSH_INTERVAL_S:
+            await asyncio.to_thread(self.container.markdown, "".join(self._parts) + "▌")
+            self._pending = 0
+            self._last_flush = now
+
+    async def on_llm_end(self, response, **kwargs):
+        """Flush any buffered tokens without the cursor once the stream ends"""
+        await asyncio.to_thread(self.container.markdown, "".join(self._parts))
+        self._pending = 0
 
 # Made with Bob
@@ -0,0 +1,43 @@
+"""
+Cached LLM Client Construction
+"""
+import functools
+
+from config.constants import GEMINI_MODELS
+
+
+@functools.lru_cache(maxsize=8)
+def get_chat_client(model: str, temperature: float, streaming: bool = True):
+    """Build (or fetch) a chat client for the given configuration
+
+    Constructing ChatOpenAI/ChatGoogleGenerativeAI sets up a fresh HTTP client
+    and connection pool each time; caching per (model, temperature, streaming)
+    reuses warm connections across turns. Per-request callbacks (e.g. stream
+    handlers) must be passed via config at invoke/stream time rather than
+    stored on the cached client.
+
+    Args:
+        model: Model identifier
+        temperature: Sampling temperature
+        streaming: Whether responses stream token-by-token
+
+    Returns:
+        Cached chat model instance
+    """
+    if model in GEMINI_MODELS:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            convert_system_message_to_human=True
+        )
+
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=model,
+        streaming=streaming,
+        stream_usage=True,  # final chunk reports exact input/output token usage
+        temperature=temperature
+    )
+
+# Made with Bob
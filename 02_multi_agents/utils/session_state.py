@@ -1,41 +1,54 @@
 """
 Session State Management for CLAPP
 """
+from collections import deque
+
 import streamlit as st
-from langchain_community.chat_message_histories import ChatMessageHistory
 
 
 class SessionStateManager:
     """Centralized session state management class"""
-    
-    # Session state key definitions and default values
+
+    # Chat history cap: one deque holds the full conversation (user + assistant
+    # turns); older entries fall off instead of growing without bound.
+    MESSAGE_HISTORY_MAXLEN = 100
+
+    # Session state key definitions, mapped to zero-arg default factories.
+    # Factories (rather than values) mean no mutable default ever lives at
+    # class scope, so two sessions can never share the same list/deque object.
     KEYS = {
-        "messages": [],
-        "debug": False,
-        "llm": None,
-        "memory": None,  # Set to ChatMessageHistory() during initialization
-        "vector_store": None,
-        "last_token_count": 0,
-        "selected_model": None,
-        "greeted": False,
-        "debug_messages": [],
-        "saved_api_key": None,
-        "saved_api_key_gai": None,
-        "agents": None,
-        "llm_initialized": False,
-        "previous_model": None,
-        "mode_is_fast": "Fast Mode"
+        "messages": lambda: deque(maxlen=SessionStateManager.MESSAGE_HISTORY_MAXLEN),
+        "debug": bool,
+        "llm": lambda: None,
+        "vector_store": lambda: None,
+        "last_token_count": int,
+        "selected_model": lambda: None,
+        "greeted": bool,
+        "debug_messages": list,
+        "saved_api_key": lambda: None,
+        "saved_api_key_gai": lambda: None,
+        "agents": lambda: None,
+        "llm_initialized": bool,
+        "previous_model": lambda: None,
+        "mode_is_fast": lambda: "Fast Mode"
     }
     
     @classmethod
     def initialize(cls):
-        """Initialize all session states"""
-        for key, default_value in cls.KEYS.items():
-            if key not in st.session_state:
-                if key == "memory":
-                    st.session_state[key] = ChatMessageHistory()
-                else:
-                    st.session_state[key] = default_value
+        """Initialize all session states
+
+        Missing keys are collected first and written with a single
+        st.session_state.update() — each individual session_state write locks
+        and notifies, so one bulk write beats N per-key writes on every rerun.
+        Factories are only invoked for keys that are actually missing.
+        """
+        missing = {
+            key: factory()
+            for key, factory in cls.KEYS.items()
+            if key not in st.session_state
+        }
+        if missing:
+            st.session_state.update(missing)
     
     @staticmethod
     def get(key: str, default=None):
@@ -60,12 +73,11 @@ class SessionStateManager:
         """
         st.session_state[key] = value
     
-    @staticmethod
-    def reset_chat():
+    @classmethod
+    def reset_chat(cls):
         """Reset chat-related states"""
         st.session_state.greeted = False
-        st.session_state.messages = []
-        st.session_state.memory = ChatMessageHistory()
+        st.session_state.messages = cls.KEYS["messages"]()
     
     @staticmethod
     def clear_api_keys():
@@ -4,16 +4,23 @@ UI Styling Utilities
 import streamlit as st
 
 
-def inject_global_styles_and_font(font_name: str):
-    """Inject global styles and font
-    
+@st.cache_resource
+def _styles_html(font_name: str) -> str:
+    """Build the style/font markup once per font
+
+    Cached so reruns skip rebuilding the f-string; preconnect and
+    display=swap keep the font fetch off the first-paint critical path.
+
     Args:
         font_name: Font name to use
+
+    Returns:
+        HTML markup for the font link and global styles
     """
     font_url_name = font_name.replace(" ", "+")
-    st.markdown(
-        f"""
-        <link href="https://fonts.googleapis.com/css?family={font_url_name}" rel="stylesheet">
+    return f"""
+        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+        <link href="https://fonts.googleapis.com/css?family={font_url_name}&display=swap" rel="stylesheet">
         <style>
         .main-title {{
             font-family: '{font_name}', sans-serif !important;
@@ -34,9 +41,16 @@ def inject_global_styles_and_font(font_name: str):
             letter-spacing: 0.5px;
         }}
         </style>
-        """,
-        unsafe_allow_html=True
-    )
+        """
+
+
+def inject_global_styles_and_font(font_name: str):
+    """Inject global styles and font
+
+    Args:
+        font_name: Font name to use
+    """
+    st.markdown(_styles_html(font_name), unsafe_allow_html=True)
 
 
 def render_header():